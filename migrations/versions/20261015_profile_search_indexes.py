@@ -0,0 +1,86 @@
+"""profile search indexes
+
+Indexes backing the profile repository queries in profile.py. They are
+built CONCURRENTLY, which cannot run inside a transaction, hence the
+autocommit blocks.
+
+NOT MERGEABLE AS IS: the application's Alembic history is not part of
+this tree, so down_revision is None. Set it to the application's current
+head before merging, otherwise this revision becomes a second base/head
+and "alembic upgrade head" fails with "multiple heads".
+
+A failed CONCURRENTLY build leaves an INVALID index behind. The CREATE
+statements deliberately have no IF NOT EXISTS, so a re-run fails loudly
+instead of skipping it: DROP INDEX CONCURRENTLY the leftover index (and
+any index that already built) before running the upgrade again.
+
+Revision ID: 7c1e4b2a9d30
+Revises:
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7c1e4b2a9d30"
+down_revision = None  # re-parent onto the app's current head, see above
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        # Keyset pagination on (created_at, id), see paginate_users
+        op.execute(
+            "CREATE INDEX CONCURRENTLY ix_userprofile_created_id "
+            "ON user_profile (created_at DESC, id DESC)"
+        )
+        # Full-text filter of get_suggested_users; must index the same
+        # expression the query matches against
+        op.execute(
+            "CREATE INDEX CONCURRENTLY userprofile_tsv_gin "
+            "ON user_profile USING gin (__ts_vector__)"
+        )
+        # Trigram name match of get_suggested_users; must stay the same
+        # expression as _PROFILE_NAME in profile.py
+        op.execute(
+            "CREATE INDEX CONCURRENTLY userprofile_name_trgm "
+            "ON user_profile USING gin "
+            "(lower(first_name || ' ' || last_name) gin_trgm_ops)"
+        )
+        # Lookups by external id in get_by_user_id / get_by_parent_code
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY ix_up_user_id "
+            "ON user_profile (user_id)"
+        )
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY ix_up_parent_code "
+            "ON user_profile (parent_code)"
+        )
+        # Student search pages: equality on profile_type, then the keyset
+        # order; covers the id page query of get_searched_users
+        op.execute(
+            "CREATE INDEX CONCURRENTLY ix_up_type_created "
+            "ON user_profile (profile_type, created_at DESC, id DESC)"
+        )
+        # Current education of a profile (selectinload and the SCHOOL
+        # filter); the predicate is written as the queries write it
+        op.execute(
+            "CREATE INDEX CONCURRENTLY ix_edu_profile_current "
+            "ON education (profile_id) "
+            "WHERE is_current = true AND deleted != true"
+        )
+    op.execute("ANALYZE user_profile")
+    op.execute("ANALYZE education")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_edu_profile_current")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_up_type_created")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_up_parent_code")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_up_user_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS userprofile_name_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS userprofile_tsv_gin")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_userprofile_created_id")
@@ -1,3 +1,12 @@
+import asyncio
+import base64
+import binascii
+import os
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from typing import Any, Optional, Type
 from uuid import UUID
 
@@ -20,11 +29,209 @@ from app.repository.db.schema.work import Work
 from app.shared.domain.data.page import Page, PageMetadata
 from app.shared.repository.db.base import BaseDBRepository
 from app.shared.utils.error import DomainError
-from sqlalchemy import and_, desc, distinct, func, or_, update
-from sqlalchemy.orm import contains_eager
+from sqlalchemy import (
+    all_,
+    and_,
+    any_,
+    bindparam,
+    desc,
+    distinct,
+    exists,
+    func,
+    insert,
+    literal_column,
+    or_,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import load_only, selectinload
 
 logger = structlog.get_logger()
 
+# Converting big pages holds the event loop for several milliseconds, so
+# they are mapped to entities on a worker thread instead.
+_CONVERT_POOL = ThreadPoolExecutor(
+    max_workers=os.cpu_count(), thread_name_prefix="profile-convert"
+)
+_CONVERT_OFFLOAD_MIN_ITEMS = 25
+_STREAM_BATCH_SIZE = 200
+
+# Anything but alphanumerics, ".", "-" and " " is dropped from full-text
+# search input (same set as str.isalnum plus those three).
+_SEARCH_TEXT_DISALLOWED = re.compile(r"[^\w.\- ]+|_+")
+
+
+def _search_filter(query_param_names: tuple[str, ...], param: dict) -> tuple:
+    """Resolve a PROFILE_QUERY_PARAMS_MAPPING entry to columns
+
+    Returns (query_param_names, table, match_on, fields); match_on links
+    table rows to a profile and is None when the fields are on UserProfile
+    itself.
+    """
+    table = param['table']
+    fields = tuple(getattr(table, name) for name in param['query_fields'])
+    if table == UserProfile:
+        return query_param_names, table, None, fields
+    match_id = param.get('match_id')
+    if match_id is None:
+        table_id = getattr(table, 'profile_id')
+        userprofile_id = UserProfile.id
+    else:
+        table_id = getattr(table, match_id['table_id'])
+        userprofile_id = UserProfile.user_id
+    deleted = getattr(table, 'deleted')
+    match_on = and_(table_id == userprofile_id, deleted != True)
+    return query_param_names, table, match_on, fields
+
+
+# FIXME: currently, the empty dicts as values in the original
+# mapping are for query parameters where search will be on karma tags.
+# We filter these out here
+_SEARCH_FILTERS = tuple(
+    _search_filter(query_param_names, param)
+    for query_param_names, param in PROFILE_QUERY_PARAMS_MAPPING.items()
+    if param
+)
+
+# Display name matched by trigram similarity in get_suggested_users. The
+# separator is rendered as a SQL literal, not a bind parameter, so the
+# statement text is exactly the userprofile_name_trgm index expression
+# (keep both in step).
+_PROFILE_NAME = func.lower(
+    UserProfile.first_name + literal_column("' '") + UserProfile.last_name
+)
+
+# id lists are bound as a single uuid[] ("id = ANY($1)") so the statement
+# text, and the driver's prepared statement, do not depend on list length.
+_UUID_ARRAY = ARRAY(PG_UUID(as_uuid=True))
+
+
+class _ProfileQueries:
+    """Statement templates for the hot lookups
+
+    Built once from the repository's select(), so each request only binds
+    parameters instead of rebuilding the select/options tree. Current
+    educations are loaded with a second "profile_id IN (...)" query, which
+    keeps one row per profile in the main statement.
+    """
+
+    def __init__(self, base: Any):
+        self.base = base.options(
+            selectinload(
+                UserProfile.educations.and_(
+                    Education.is_current == True,
+                    Education.deleted != True,
+                )
+            )
+        )
+        self.by_user_id = self.base.where(
+            UserProfile.user_id == bindparam("user_id")
+        )
+        self.by_id = self.base.where(UserProfile.id == bindparam("id"))
+        self.by_parent_code = self.base.where(
+            UserProfile.parent_code == bindparam("parent_code")
+        )
+        self.by_ids = self.base.where(
+            UserProfile.id == any_(bindparam("ids", type_=_UUID_ARRAY))
+        )
+
+
+# Pages are assembled from already validated entities and metadata, so
+# they are built with construct() instead of being validated again.
+_ProfilePage = Page[UserProfileProps]
+
+
+async def _gather_all(*aws: Any) -> list[Any]:
+    """asyncio.gather that lets every awaitable finish before raising
+
+    Used for queries on sibling sessions: raising while one is still
+    running would close its session mid-operation and hide the error.
+    """
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+def _encode_cursor(created_at: datetime, id: UUID) -> str:
+    """Opaque cursor pointing just after the (created_at, id) row"""
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_at, id = base64.urlsafe_b64decode(cursor).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise DomainError("invalid cursor") from e
+
+
+class _ProfileCache:
+    """In-process LRU of profile lookups with a short TTL
+
+    Keys are (lookup, value) tuples, e.g. ("user_id", user_id). Misses are
+    not cached. invalidate() drops every key of a profile and makes
+    in-flight lookups started before it skip their set().
+    """
+
+    def __init__(self, maxsize: int, ttl: float, log_every: int = 1000):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._log_every = log_every
+        self._entries: OrderedDict[tuple, tuple[float, UserProfileProps]] = (
+            OrderedDict()
+        )
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[UserProfileProps]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            self._log_stats()
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self._log_stats()
+        return entry[1].copy(deep=True)
+
+    def _log_stats(self) -> None:
+        """Log hit/miss counters every log_every lookups"""
+        if (self.hits + self.misses) % self._log_every:
+            return
+        logger.info(
+            "profile_cache_stats",
+            hits=self.hits,
+            misses=self.misses,
+            size=len(self._entries),
+        )
+
+    def set(self, key: tuple, value: UserProfileProps, version: int) -> None:
+        if version != self.version:
+            return
+        expires = time.monotonic() + self._ttl
+        self._entries[key] = (expires, value.copy(deep=True))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, profile_id: UUID) -> None:
+        self.version += 1
+        for key in [
+            key for key, (_, value) in self._entries.items()
+            if value.id == profile_id
+        ]:
+            del self._entries[key]
+
+
+_profile_cache = _ProfileCache(maxsize=4096, ttl=30)
+
 
 class UserProfileDBRepository(
     BaseDBRepository[UserProfileProps, UserProfile], UserProfileRepository
@@ -37,43 +244,53 @@ class UserProfileDBRepository(
     def _entity(self) -> Type[UserProfileProps]:
         return UserProfileProps
 
+    @property
+    def _queries(self) -> _ProfileQueries:
+        """Statement templates, derived once per class from self.select()"""
+        cls = type(self)
+        queries = cls.__dict__.get("_profile_queries")
+        if queries is None:
+            queries = _ProfileQueries(self.select())
+            cls._profile_queries = queries
+        return queries
+
+    async def _to_entities(
+        self, objs: list[UserProfile]
+    ) -> list[UserProfileProps]:
+        """Convert ORM rows to entities
+
+        Large pages are converted off the event loop.
+        """
+        if len(objs) < _CONVERT_OFFLOAD_MIN_ITEMS:
+            return self._from_orm_all(objs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _CONVERT_POOL, self._from_orm_all, objs
+        )
+
+    def _from_orm_all(self, objs: list[UserProfile]) -> list[UserProfileProps]:
+        return [self._entity.from_orm(obj) for obj in objs]
+
     async def get_by_user_id(self, user_id: UUID) -> Optional[UserProfileProps]:
+        key = ("user_id", user_id)
+        cached = _profile_cache.get(key)
+        if cached is not None:
+            return cached
+        version = _profile_cache.version
         async with self._db_session() as session:
-            query = (
-                self.select()
-                .outerjoin(
-                    Education,
-                    and_(
-                        Education.is_current == True,
-                        Education.profile_id == UserProfile.id,
-                        Education.deleted != True,
-                    ),
-                )
-                .where(UserProfile.user_id == user_id)
-                .options(contains_eager(self._table.educations))
+            result = await session.execute(
+                self._queries.by_user_id, {"user_id": user_id}
             )
-            result = await session.execute(query)
             obj = result.scalars().first()
             if not obj:
                 return None
-            return self._entity.from_orm(obj)
+            entity = self._entity.from_orm(obj)
+        _profile_cache.set(key, entity, version)
+        return entity
 
     async def get_profile_by_id(self, id: UUID) -> Optional[UserProfileProps]:
         async with self._db_session() as session:
-            query = (
-                self.select()
-                .outerjoin(
-                    Education,
-                    and_(
-                        Education.is_current == True,
-                        Education.profile_id == UserProfile.id,
-                        Education.deleted != True,
-                    ),
-                )
-                .where(UserProfile.id == id)
-                .options(contains_eager(UserProfile.educations))
-            )
-            result = await session.execute(query)
+            result = await session.execute(self._queries.by_id, {"id": id})
             obj = result.scalars().first()
             if not obj:
                 return None
@@ -85,6 +302,18 @@ class UserProfileDBRepository(
             query = self._table(**entity_dict)
             session.add(query)
             await session.commit()
+        _profile_cache.invalidate(entity.id)
+
+    async def create_profiles(self, entities: list[UserProfileProps]) -> None:
+        """Insert many profiles in one executemany round-trip"""
+        if not entities:
+            return
+        async with self._db_session() as session:
+            await session.execute(
+                insert(self._table),  # type: ignore
+                [entity.dict(exclude={"educations"}) for entity in entities],
+            )
+            await session.commit()
 
     async def update_profile(self, entity: UserProfileProps) -> None:
         async with self._db_session() as session:
@@ -93,33 +322,75 @@ class UserProfileDBRepository(
                 update(self._table)  # type: ignore
                 .where(self._table.id == entity.id)
                 .values(**entity_dict)
-                .execution_options(synchronize_session="fetch")
+                .execution_options(synchronize_session=False)
             )
             await session.execute(query)
             await session.commit()
+        _profile_cache.invalidate(entity.id)
 
     async def paginate_users(
-        self, query: Any, page: int, page_size: int
+        self,
+        query: Any,
+        page: int,
+        page_size: int,
+        cursor: Optional[str] = None,
+        count: bool = False,
     ) -> tuple[list[UserProfile], PageMetadata]:
-        async with self._db_session() as session:
-            if page <= 0:
-                raise DomainError("page should be be >= 1")
-            if page_size <= 0:
-                raise DomainError("page_size should be >= 1")
-            paginated_query = (
-                query.order_by(desc(UserProfile.created_at))
-                .limit(page_size)
-                .offset((page - 1) * page_size)
+        """Paginate query results, newest first
+
+        With a cursor (the next_cursor of a previous page) the page is read
+        with a keyset condition on (created_at, id); without one, the
+        deprecated LIMIT/OFFSET path is used. One extra row is fetched to
+        tell whether another page follows. The total is only counted when
+        count is set, and never for cursor pages.
+        """
+        if page <= 0:
+            raise DomainError("page should be be >= 1")
+        if page_size <= 0:
+            raise DomainError("page_size should be >= 1")
+        ordered_query = query.order_by(
+            desc(UserProfile.created_at), desc(UserProfile.id)
+        )
+        if cursor:
+            cur_created_at, cur_id = _decode_cursor(cursor)
+            paginated_query = ordered_query.where(
+                tuple_(UserProfile.created_at, UserProfile.id)
+                < tuple_(cur_created_at, cur_id)
             )
+        else:
+            paginated_query = ordered_query.offset((page - 1) * page_size)
+        paginated_query = paginated_query.limit(page_size + 1)
+
+        total = None
+        if count and not cursor:
             count_query = query.with_only_columns(func.count(self._table.id))
-            results = await session.execute(paginated_query)
-            total_result = await session.execute(count_query)
-            page_data = PageMetadata(
-                page=page,
-                page_size=page_size,
-                total=total_result.scalar_one(),
-            )
-            return (results.scalars().unique().all(), page_data)
+            # Independent queries: run them on two pooled connections
+            async with self._db_session() as session:
+                async with self._db_session() as count_session:
+                    results, total_result = await _gather_all(
+                        session.execute(paginated_query),
+                        count_session.execute(count_query),
+                    )
+                items = results.scalars().all()
+                total = total_result.scalar_one()
+        else:
+            async with self._db_session() as session:
+                results = await session.execute(paginated_query)
+                items = results.scalars().all()
+
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        next_cursor = None
+        if has_more:
+            next_cursor = _encode_cursor(items[-1].created_at, items[-1].id)
+        page_data = PageMetadata(
+            page=page,
+            page_size=page_size,
+            total=total,
+            has_more=has_more,
+            next_cursor=next_cursor,
+        )
+        return (items, page_data)
 
     async def _get_extra_profiles(self, query, nextra):
         """Get extra profiles from query
@@ -127,15 +398,16 @@ class UserProfileDBRepository(
         query: query to run
         nextra: number of results to fetch
         """
+        count_query = query.with_only_columns(func.count(self._table.id))
+        extra_query = query.order_by(
+            desc(UserProfile.created_at), desc(UserProfile.id)
+        ).limit(nextra)
         async with self._db_session() as session:
-            count_query = query.with_only_columns(func.count(self._table.id))
-            total_result = await session.execute(count_query)
-
-            extra_query = query.order_by(
-                desc(UserProfile.created_at)
-            ).limit(nextra)
-            results = await session.execute(extra_query)
-
+            async with self._db_session() as count_session:
+                results, total_result = await _gather_all(
+                    session.execute(extra_query),
+                    count_session.execute(count_query),
+                )
             return results.scalars().unique().all(), total_result.scalar_one()
 
     async def get_suggested_users(
@@ -146,99 +418,119 @@ class UserProfileDBRepository(
         page: int,
         page_size: int,
         text: str,
+        cursor: Optional[str] = None,
+        count: bool = True,
     ) -> Page[UserProfileProps]:
-        query = (
-            self.select()
-            .where(UserProfile.user_id != user_id)
-            .outerjoin(
-                Education,
-                and_(
-                    Education.is_current == True,
-                    Education.profile_id == UserProfile.id,
-                    Education.deleted != True,
-                ),
-            )
-            .options(contains_eager(UserProfile.educations))
-        )
+        query = self._queries.base.where(UserProfile.user_id != user_id)
         if text:
-            text = "".join(
-                [c for c in text if c.isalnum() or c in [".", "-", " "]])
+            tokens = text.split()
+            text = _SEARCH_TEXT_DISALLOWED.sub("", text)
             text = "&".join(text.split())
-            query = query.filter(UserProfile.__ts_vector__.match(f"{text}:*"))
+            text_match = UserProfile.__ts_vector__.bool_op("@@")(
+                func.to_tsquery(f"{text}:*")
+            )
+            if len(tokens) == 1:
+                # Single token: also a substring/typo tolerant match on the
+                # name, on top of the full-text prefix match
+                text_match = or_(
+                    _PROFILE_NAME.bool_op("%>")(tokens[0].lower()),
+                    text_match,
+                )
+            query = query.filter(text_match)
         if include_profile_ids:
-            query = query.where(self._table.id.in_(include_profile_ids))
+            query = query.where(
+                self._table.id == any_(
+                    bindparam(
+                        "include_ids", include_profile_ids, type_=_UUID_ARRAY
+                    )
+                )
+            )
         if exclude_profile_ids:
-            query = query.where(self._table.id.notin_(exclude_profile_ids))
-        results, page_metadata = await self.paginate_users(query, page, page_size)
-        items = list(map(lambda obj: self._entity.from_orm(obj), results))
-        return Page(items=items, **page_metadata.dict())
+            query = query.where(
+                self._table.id != all_(
+                    bindparam(
+                        "exclude_ids", exclude_profile_ids, type_=_UUID_ARRAY
+                    )
+                )
+            )
+        results, page_metadata = await self.paginate_users(
+            query, page, page_size, cursor, count
+        )
+        items = await self._to_entities(results)
+        return _ProfilePage.construct(items=items, **dict(page_metadata))
 
     async def search_profile_users(
         self,
         user_id: UUID,
         search_user_params: SearchUsersParams,
+        page: int,
+        page_size: int,
+        cursor: Optional[str] = None,
+        count: bool = True,
     ) -> Page[UserProfileProps]:
-        query = (
-            self.select()
-            .where(UserProfile.user_id != user_id)
-            .outerjoin(
-                Education,
-                and_(
-                    Education.is_current == True,
-                    Education.profile_id == UserProfile.id,
-                    Education.deleted != True,
-                ),
-            )
-            .options(contains_eager(UserProfile.educations))
+        """Search student profiles, leaving out the searching user"""
+        return await self.get_searched_users(
+            page,
+            page_size,
+            search_user_params,
+            cursor,
+            count,
+            exclude_user_id=user_id,
         )
 
-        return Page(items=items, **page_metadata.dict())
-
     async def get_by_parent_code(self, parent_code: str) -> Optional[UserProfileProps]:
+        key = ("parent_code", parent_code)
+        cached = _profile_cache.get(key)
+        if cached is not None:
+            return cached
+        version = _profile_cache.version
         async with self._db_session() as session:
-            query = (
-                self.select()
-                .outerjoin(
-                    Education,
-                    and_(
-                        Education.is_current == True,
-                        Education.profile_id == UserProfile.id,
-                        Education.deleted != True,
-                    ),
-                )
-                .where(UserProfile.parent_code == parent_code)
-                .options(contains_eager(UserProfile.educations))
+            result = await session.execute(
+                self._queries.by_parent_code, {"parent_code": parent_code}
             )
-            result = await session.execute(query)
             obj = result.scalars().first()
             if not obj:
                 return None
-            return self._entity.from_orm(obj)
+            entity = self._entity.from_orm(obj)
+        _profile_cache.set(key, entity, version)
+        return entity
 
     async def get_profiles(
         self, include_profile_ids: list[UUID]
     ) -> list[UserProfileProps]:
-        async with self._db_session() as session:
-            query = (
-                self.select()
-                .outerjoin(
-                    Education,
-                    and_(
-                        Education.is_current == True,
-                        Education.profile_id == UserProfile.id,
-                        Education.deleted != True,
-                    ),
-                )
-                .options(contains_eager(UserProfile.educations))
-            ).where(self._table.id.in_(include_profile_ids))
-            results = await session.execute(query)
-            items = list(
-                map(
-                    lambda obj: self._entity.from_orm(obj),
-                    results.scalars().unique().all(),
+        if len(include_profile_ids) <= _STREAM_BATCH_SIZE:
+            async with self._db_session() as session:
+                results = await session.execute(
+                    self._queries.by_ids, {"ids": include_profile_ids}
                 )
+                objs = results.scalars().all()
+            return await self._to_entities(objs)
+
+        # Long id lists: stream on a server-side cursor so only one batch of
+        # ORM rows is alive at a time (the connection stays checked out
+        # while batches are converted)
+        items = []
+        async with self._db_session() as session:
+            results = await session.stream_scalars(
+                self._queries.by_ids.execution_options(
+                    yield_per=_STREAM_BATCH_SIZE
+                ),
+                {"ids": include_profile_ids},
+            )
+            async for objs in results.partitions():
+                items += await self._to_entities(objs)
+        return items
+
+    async def _load_profiles(self, ids: list[UUID]) -> list[UserProfile]:
+        """Load profiles with their current education, in the order of ids"""
+        if not ids:
+            return []
+        async with self._db_session() as session:
+            results = await session.execute(
+                self._queries.by_ids, {"ids": ids}
             )
-            return items
+            profiles = {obj.id: obj for obj in results.scalars().all()}
+        return [profiles[id] for id in ids if id in profiles]
 
     async def _results_count(self, query):
         """Count of query results"""
@@ -258,23 +550,20 @@ class UserProfileDBRepository(
     def _add_education_query(self, obj: Any, query_param):
         """Adds query on Education table
 
-        obj: either self.select() or query, depending on if query was None
+        obj: query to filter
         query_param: list of Education institution IDs to filter on
         """
         query = obj.filter(
             UserProfile.profile_type == "STUDENT"
-        ).join(
-            Education,
-            and_(
-                Education.is_current == True,
-                Education.profile_id == UserProfile.id,
-                Education.deleted != True,
-            ),
-            full=True
         ).filter(
-            Education.institution_id.in_(query_param),
-        ).options(
-            contains_eager(UserProfile.educations)
+            exists().where(
+                and_(
+                    Education.is_current == True,
+                    Education.profile_id == UserProfile.id,
+                    Education.deleted != True,
+                    Education.institution_id.in_(query_param),
+                )
+            )
         )
 
         return query
@@ -283,17 +572,13 @@ class UserProfileDBRepository(
         self,
         page: int,
         page_size: int,
-        search_user_params: SearchUsersParams
+        search_user_params: SearchUsersParams,
+        cursor: Optional[str] = None,
+        count: bool = True,
+        exclude_user_id: Optional[UUID] = None,
     ) -> Page[UserProfileProps]:
-        query = None
-
-        # FIXME: currently, the empty dicts as values in the original
-        # mapping are for query parameters where search will be on karma tags.
-        # We filter these out in the for-loop clause
         conditions = []
-        for query_param_names, param in dict(
-            (k, v) for k, v in PROFILE_QUERY_PARAMS_MAPPING.items() if v
-        ).items():
+        for query_param_names, table, match_on, fields in _SEARCH_FILTERS:
             query_param = []
             for name in query_param_names:
                 query_param += getattr(search_user_params, name)
@@ -302,82 +587,51 @@ class UserProfileDBRepository(
                 # No argument was given for this query parameter: skip it
                 continue
 
-            query_fields = param['query_fields']
-            if param['table'] == UserProfile:
+            field_conditions = [field.in_(query_param) for field in fields]
+            if match_on is None:
                 # Query on this table
-                for name in query_fields:
-                    field = getattr(UserProfile, name)
-                    conditions.append(field.in_(query_param))
+                conditions += field_conditions
             else:
-                # Query on another table: do a JOIN
-                match_id = param.get('match_id')
-                if match_id is None:
-                    table_id = getattr(param['table'], 'profile_id')
-                    userprofile_id = UserProfile.id
-                else:
-                    table_id = getattr(param['table'], match_id['table_id'])
-                    userprofile_id = UserProfile.user_id
-
-                deleted = getattr(param['table'], 'deleted')
-
-                for name in query_fields:
-                    field = getattr(param['table'], name)
-                    conditions.append(field.in_(query_param))
-
-                if query is None:
-                    query = self.select().join(
-                        param['table'],
-                        and_(
-                            table_id == userprofile_id,
-                            deleted != True
-                        ),
-                        full=True
-                    )
-                else:
-                    query = query.outerjoin(
-                        param['table'],
-                        and_(
-                            table_id == userprofile_id,
-                            deleted != True
-                        ),
-                        full=True
-                    )
-
-        if conditions:
-            if query is None:
-                # Might happen if only UserProfile table is queried
-                query = self.select().filter(or_(*conditions))
-            else:
-                query = query.filter(or_(*conditions))
+                # Query on another table: EXISTS semi-join, no row fanout
+                conditions.append(
+                    exists().where(and_(match_on, or_(*field_conditions)))
+                )
 
         query_param = getattr(search_user_params, 'SCHOOL')
-        if query is None:
-            if query_param:
-                query = self._add_education_query(self.select(), query_param)
-            else:
-                query = self.select().filter(
-                    UserProfile.profile_type == "STUDENT"
-                ).outerjoin(Education).options(
-                    contains_eager(UserProfile.educations)
-                )
+        if not conditions and not query_param:
+            # No filter given: page straight over the students, without the
+            # id/hydrate split
+            query = self._queries.base.where(
+                UserProfile.profile_type == "STUDENT"
+            )
+            if exclude_user_id is not None:
+                query = query.where(UserProfile.user_id != exclude_user_id)
+            results, page_metadata = await self.paginate_users(
+                query, page, page_size, cursor, count
+            )
         else:
-            # Additional filter on existing query
+            query = self.select()
+            if conditions:
+                query = query.filter(or_(*conditions))
+
             if query_param:
                 query = self._add_education_query(query, query_param)
             else:
-                query = query.filter(
-                    UserProfile.profile_type == "STUDENT"
-                ).outerjoin(Education).options(
-                    contains_eager(UserProfile.educations)
-                )
+                query = query.filter(UserProfile.profile_type == "STUDENT")
+            if exclude_user_id is not None:
+                query = query.where(UserProfile.user_id != exclude_user_id)
 
-        query = query.distinct()
-        results, page_metadata = await self.paginate_users(
-            query, page, page_size
-        )
+            # Page over the matching ids only, then load those profiles
+            id_query = query.options(
+                load_only(UserProfile.id, UserProfile.created_at)
+            )
+            id_rows, page_metadata = await self.paginate_users(
+                id_query, page, page_size, cursor, count
+            )
+            results = await self._load_profiles([obj.id for obj in id_rows])
 
         # temporarily disabling all records return
-        metadata = page_metadata.dict()
+        metadata = dict(page_metadata)
 
         # if results:
         #     # Check if additional results are needed
@@ -413,5 +667,5 @@ class UserProfileDBRepository(
         #     )
         #     metadata = page_metadata.dict()
 
-        items = list(map(lambda obj: self._entity.from_orm(obj), results))
-        return Page(items=items, **metadata)
+        items = await self._to_entities(results)
+        return _ProfilePage.construct(items=items, **metadata)